@@ -2,9 +2,22 @@ import pysolr
 import csv
 import requests
 import json
+from dataclasses import dataclass
+from typing import Any, Optional
 
 SOLR_URL = 'http://localhost:8983/solr'
 
+# Shared session so every admin and pysolr call reuses pooled keep-alive connections
+session = requests.Session()
+
+
+@dataclass(slots=True)
+class Result:
+    """Outcome of a Solr operation: `value` on success, `error` on failure."""
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+
 
 
 # def test_core_connection(core_name):
@@ -38,7 +51,7 @@ SOLR_URL = 'http://localhost:8983/solr'
 
 def check_solr_connection():
     try:
-        response = requests.get(f"{SOLR_URL}/admin/cores?action=STATUS&wt=json")
+        response = session.get(f"{SOLR_URL}/admin/cores?action=STATUS&wt=json")
         response.raise_for_status()
         print(f"Solr connection successful. Response: {response.text}")
         return True
@@ -51,7 +64,7 @@ def check_solr_connection():
 
 def check_core_exists(core_name):
     try:
-        response = requests.get(f"{SOLR_URL}/admin/cores?action=STATUS&core={core_name}&wt=json")
+        response = session.get(f"{SOLR_URL}/admin/cores?action=STATUS&core={core_name}&wt=json")
         response.raise_for_status()
         cores = response.json()['status']
         exists = core_name in cores
@@ -69,7 +82,7 @@ def check_core_exists(core_name):
 def createCore(core_name):
     if check_core_exists(core_name):
         print(f"Core {core_name} already exists.")
-        return f"Core {core_name} already exists."
+        return Result(True, f"Core {core_name} already exists.")
     
     params = {
         'action': 'CREATE',
@@ -78,23 +91,23 @@ def createCore(core_name):
         'configSet': '_default'
     }
     try:
-        response = requests.get(f"{SOLR_URL}/admin/cores", params=params)
+        response = session.get(f"{SOLR_URL}/admin/cores", params=params)
         response.raise_for_status()
         print(f"Core creation response: {response.text}")
         if 'success' in response.json():
-            return f"Core {core_name} created successfully."
+            return Result(True, f"Core {core_name} created successfully.")
         else:
-            return f"Failed to create core {core_name}. Response: {response.text}"
+            return Result(False, error=f"Failed to create core {core_name}. Response: {response.text}")
     except requests.exceptions.RequestException as e:
         print(f"Error creating core {core_name}: {str(e)}")
         if hasattr(e, 'response'):
             print(f"Response status code: {e.response.status_code}")
             print(f"Response content: {e.response.text}")
-        return f"Failed to create core {core_name}. Error: {str(e)}"
+        return Result(False, error=f"Failed to create core {core_name}. Error: {str(e)}")
 
 def indexData(core_name, exclude_column):
     try:
-        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=True)
+        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=False, session=session)
         with open('employee_data.csv', 'r') as file:
             reader = csv.DictReader(file)
             documents = []
@@ -102,50 +115,53 @@ def indexData(core_name, exclude_column):
                 doc = {k: v for k, v in row.items() if k != exclude_column}
                 documents.append(doc)
             print(f"Attempting to index {len(documents)} documents into {core_name}")
-            solr.add(documents)
-        return f"Data indexed into {core_name}, excluding column {exclude_column}"
+            solr.add(documents, commit=False)
+            # One commit after the bulk add, waiting for the searcher so later reads see the data
+            solr.commit()
+        return Result(True, f"Data indexed into {core_name}, excluding column {exclude_column}")
     except FileNotFoundError:
         print("Error: employee_data.csv file not found in the current directory.")
-        return "Failed to index data: CSV file not found"
+        return Result(False, error="Failed to index data: CSV file not found")
     
 
 def searchByColumn(core_name, column_name, column_value):
     try:
-        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=True)
+        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=False, session=session)
         query = f'{column_name}:"{column_value}"'
         results = solr.search(query)
-        return list(results)
+        return Result(True, list(results))
     except Exception as e:
         print(f"Search error details: {str(e)}")
-        return f"Failed to search: {str(e)}"
+        return Result(False, error=f"Failed to search: {str(e)}")
 
 def getEmpCount(core_name):
     try:
-        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=True)
+        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=False, session=session)
         results = solr.search('*:*', rows=0)
-        return results.hits
+        return Result(True, results.hits)
     except Exception as e:
         print(f"Error getting employee count: {str(e)}")
-        return f"Failed to get employee count: {str(e)}"
+        return Result(False, error=f"Failed to get employee count: {str(e)}")
 
 def delEmpById(core_name, employee_id):
     try:
-        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=True)
-        solr.delete(id=employee_id)
-        return f"Employee with ID {employee_id} deleted from {core_name}"
+        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=False, session=session)
+        # Soft commit so the count that follows sees the delete without an fsync
+        solr.delete(id=employee_id, commit=False, softCommit=True)
+        return Result(True, f"Employee with ID {employee_id} deleted from {core_name}")
     except Exception as e:
         print(f"Error deleting employee: {str(e)}")
-        return f"Failed to delete employee: {str(e)}"
+        return Result(False, error=f"Failed to delete employee: {str(e)}")
 
 def getDepFacet(core_name):
     try:
-        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=True)
+        solr = pysolr.Solr(f'{SOLR_URL}/{core_name}/', always_commit=False, session=session)
         results = solr.search('*:*', facet='on', facet_field='Department')
-        facet_counts = results.facets['facet_fields']['Department']
-        return dict(zip(facet_counts[::2], facet_counts[1::2]))
+        it = iter(results.facets['facet_fields']['Department'])
+        return Result(True, dict(zip(it, it)))
     except Exception as e:
         print(f"Error getting department facet: {str(e)}")
-        return f"Failed to get department facet: {str(e)}"
+        return Result(False, error=f"Failed to get department facet: {str(e)}")
 
 def main():
     if not check_solr_connection():
@@ -156,68 +172,70 @@ def main():
     v_phoneCore = 'Hash_1234'
 
     print("1. Create Cores:")
-    print(createCore(v_nameCore))
-    print(createCore(v_phoneCore))
+    core_result1 = createCore(v_nameCore)
+    print(core_result1.value if core_result1.ok else core_result1.error)
+    core_result2 = createCore(v_phoneCore)
+    print(core_result2.value if core_result2.ok else core_result2.error)
 
     print("\n2. Get Employee Count (before indexing):")
     emp_count = getEmpCount(v_nameCore)
-    print(f"Employee count in {v_nameCore}: {emp_count}")
-    if isinstance(emp_count, str) and "Failed" in emp_count:
+    print(f"Employee count in {v_nameCore}: {emp_count.value if emp_count.ok else emp_count.error}")
+    if not emp_count.ok:
         print("Error getting employee count. Please check Solr connection and core existence.")
 
     print("\n3. Index Data:")
     index_result1 = indexData(v_nameCore, 'Department')
-    print(index_result1)
-    if "Failed" in index_result1:
+    print(index_result1.value if index_result1.ok else index_result1.error)
+    if not index_result1.ok:
         print("Error indexing data. Please check the CSV file and Solr core.")
     
     index_result2 = indexData(v_phoneCore, 'Gender')
-    print(index_result2)
-    if "Failed" in index_result2:
+    print(index_result2.value if index_result2.ok else index_result2.error)
+    if not index_result2.ok:
         print("Error indexing data. Please check the CSV file and Solr core.")
 
     print("\n4. Delete Employee:")
     del_result = delEmpById(v_nameCore, 'E02003')
-    print(del_result)
-    if "Failed" in del_result:
+    print(del_result.value if del_result.ok else del_result.error)
+    if not del_result.ok:
         print("Error deleting employee. Please check if the employee exists and the core is accessible.")
 
     print("\n5. Get Employee Count (after indexing and deletion):")
     emp_count = getEmpCount(v_nameCore)
-    print(f"Employee count in {v_nameCore}: {emp_count}")
-    if isinstance(emp_count, str) and "Failed" in emp_count:
+    print(f"Employee count in {v_nameCore}: {emp_count.value if emp_count.ok else emp_count.error}")
+    if not emp_count.ok:
         print("Error getting employee count. Please check Solr connection and core existence.")
 
     print("\n6. Search by Column:")
     print(f"Employees in IT department ({v_nameCore}):")
     search_result1 = searchByColumn(v_nameCore, 'Department', 'IT')
-    print(search_result1)
-    if isinstance(search_result1, str) and "Failed" in search_result1:
+    print(search_result1.value if search_result1.ok else search_result1.error)
+    if not search_result1.ok:
         print("Error searching. Please check Solr connection and core existence.")
 
     print(f"\nMale employees ({v_nameCore}):")
     search_result2 = searchByColumn(v_nameCore, 'Gender', 'Male')
-    print(search_result2)
-    if isinstance(search_result2, str) and "Failed" in search_result2:
+    print(search_result2.value if search_result2.ok else search_result2.error)
+    if not search_result2.ok:
         print("Error searching. Please check Solr connection and core existence.")
 
     print(f"\nEmployees in IT department ({v_phoneCore}):")
     search_result3 = searchByColumn(v_phoneCore, 'Department', 'IT')
-    print(search_result3)
-    if isinstance(search_result3, str) and "Failed" in search_result3:
+    print(search_result3.value if search_result3.ok else search_result3.error)
+    if not search_result3.ok:
         print("Error searching. Please check Solr connection and core existence.")
 
     print("\n7. Get Department Facet:")
     print(f"Department facet for {v_nameCore}:")
     facet_result1 = getDepFacet(v_nameCore)
-    print(facet_result1)
-    if isinstance(facet_result1, str) and "Failed" in facet_result1:
+    print(facet_result1.value if facet_result1.ok else facet_result1.error)
+    if not facet_result1.ok:
         print("Error getting department facet. Please check Solr connection and core existence.")
 
     print(f"\nDepartment facet for {v_phoneCore}:")
     facet_result2 = getDepFacet(v_phoneCore)
-    print(facet_result2)
-    if isinstance(facet_result2, str) and "Failed" in facet_result2:
+    print(facet_result2.value if facet_result2.ok else facet_result2.error)
+    if not facet_result2.ok:
         print("Error getting department facet. Please check Solr connection and core existence.")
 
 if __name__ == "__main__":
@@ -1,11 +1,19 @@
+import asyncio
 import os
-import pysolr
+import pysolr  # type: ignore[import-untyped]
 import csv
 import requests
 import json
+import orjson
 import logging
-from typing import Dict, List, Union
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from operator import itemgetter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +22,19 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Upper bound on in-flight Solr requests; more just queue up on the server
+MAX_WORKERS = int(os.getenv('SOLR_MAX_WORKERS', '4'))
+
+# Backslash-escapes Lucene query syntax characters in user-supplied values
+_LUCENE_ESCAPE = str.maketrans({c: '\\' + c for c in r'+-&|!(){}[]^"~*?:\/'})
+
+@dataclass(slots=True)
+class Result:
+    """Outcome of a SolrClient operation: `value` on success, `error` on failure."""
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
+
 class SolrClient:
     """A class to handle interactions with Apache Solr."""
 
@@ -25,43 +46,136 @@ class SolrClient:
             base_url (str): The base URL for the Solr instance.
         """
         self.base_url = base_url
+        # One pooled session shared by the admin calls and every pysolr client
+        self._session = requests.Session()
+        # POST is left out: a streamed update body is consumed and can't be replayed
+        retry = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                      allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(16, MAX_WORKERS), max_retries=retry)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        # (connect, read) timeouts so a hung Solr can't stall the run or pin a worker
+        self._timeout = (float(os.getenv('SOLR_CONNECT_TIMEOUT', '2')),
+                         float(os.getenv('SOLR_READ_TIMEOUT', '30')))
+        self._solr_clients: Dict[str, pysolr.Solr] = {}
+        # Core STATUS from check_connection, reused for existence checks
+        self._core_status: Optional[Dict[str, Dict]] = None
+
+    def _solr(self, core_name: str) -> pysolr.Solr:
+        """Return the cached pysolr client for a core, creating it on first use."""
+        solr = self._solr_clients.get(core_name)
+        if solr is None:
+            solr = pysolr.Solr(f'{self.base_url}/{core_name}/', always_commit=False, session=self._session,
+                               timeout=self._timeout[1])
+            # setdefault keeps the first instance if worker threads race on a new core
+            solr = self._solr_clients.setdefault(core_name, solr)
+        return solr
+
+    def _stream_update(self, core_name: str, batches: Iterator[List[Dict[str, str]]]) -> int:
+        """Stream batches to a core's JSON update handler in one chunked request; return the document count."""
+        indexed = 0
+        # Pull the first batch up front so CSV errors surface here rather than mid-request
+        first = next(batches, None)
+
+        def body() -> Iterator[bytes]:
+            nonlocal indexed
+            yield b'['
+            for n, batch in enumerate(chain([first] if first else [], batches)):
+                if n:
+                    yield b','
+                # One C-level encode per batch, minus the list brackets
+                yield orjson.dumps(batch)[1:-1]
+                indexed += len(batch)
+            yield b']'
+
+        # A generator body makes requests send chunked, so Solr parses while we read the CSV
+        response = self._session.post(
+            f'{self.base_url}/{core_name}/update/json/docs',
+            data=body(),
+            headers={'Content-Type': 'application/json'},
+            params={'commit': 'false'},
+            timeout=self._timeout
+        )
+        response.raise_for_status()
+        return indexed
+
+    def _select(self, core_name: str, params: Dict[str, Union[str, int]]) -> Dict:
+        """Run a query against a core's select handler and return the decoded JSON."""
+        response = self._session.get(
+            f'{self.base_url}/{core_name}/select',
+            params={**params, 'wt': 'json', 'omitHeader': 'true'},
+            timeout=self._timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _get_by_id(self, core_name: str, doc_id: str, fields: Optional[List[str]] = None) -> List[Dict]:
+        """Fetch one document through the real-time get handler, skipping the search path."""
+        params = {'id': doc_id, 'wt': 'json'}
+        if fields:
+            params['fl'] = ','.join(fields)
+        response = self._session.get(f'{self.base_url}/{core_name}/get', params=params, timeout=self._timeout)
+        response.raise_for_status()
+        doc = response.json().get('doc')
+        return [doc] if doc else []
 
     def check_connection(self) -> bool:
         """Check the connection to Solr."""
         try:
-            response = requests.get(f"{self.base_url}/admin/cores?action=STATUS&wt=json")
+            response = self._session.get(f"{self.base_url}/admin/cores?action=STATUS&wt=json", timeout=self._timeout)
             response.raise_for_status()
             logger.info(f"Solr connection successful. Response: {response.text}")
+            self._core_status = response.json().get('status', {})
             return True
         except requests.exceptions.RequestException as e:
             logger.error(f"Error connecting to Solr: {str(e)}")
-            if hasattr(e, 'response'):
+            if e.response is not None:
                 logger.error(f"Response status code: {e.response.status_code}")
                 logger.error(f"Response content: {e.response.text}")
             return False
 
     def check_core_exists(self, core_name: str) -> bool:
         """Check if a Solr core exists."""
+        # The STATUS cached by check_connection answers without a round trip; a core
+        # created elsewhere since then is caught when create_core's CREATE fails
+        if self._core_status is not None:
+            exists = core_name in self._core_status
+            logger.info(f"Core {core_name} exists: {exists}")
+            if not exists:
+                logger.info(f"Available cores: {list(self._core_status.keys())}")
+            return exists
+        return self._fetch_core_exists(core_name)
+
+    def _fetch_core_exists(self, core_name: str) -> bool:
+        """Ask Solr for a single core's STATUS, recording the core in the cache if it exists."""
         try:
-            response = requests.get(f"{self.base_url}/admin/cores?action=STATUS&core={core_name}&wt=json")
+            response = self._session.get(f"{self.base_url}/admin/cores?action=STATUS&core={core_name}&wt=json",
+                                         timeout=self._timeout)
             response.raise_for_status()
             cores = response.json()['status']
-            exists = core_name in cores
+            # Solr answers STATUS for an unknown core with an empty entry under its name
+            exists = bool(cores.get(core_name))
             logger.info(f"Core {core_name} exists: {exists}")
+            if exists and self._core_status is not None:
+                self._core_status[core_name] = cores[core_name]
             if not exists:
-                logger.info(f"Available cores: {list(cores.keys())}")
+                logger.info(f"Available cores: {[name for name, status in cores.items() if status]}")
             return exists
         except requests.exceptions.RequestException as e:
             logger.error(f"Error checking core {core_name}: {str(e)}")
-            if hasattr(e, 'response'):
+            if e.response is not None:
                 logger.error(f"Response status code: {e.response.status_code}")
                 logger.error(f"Response content: {e.response.text}")
             return False
 
-    def create_core(self, core_name: str) -> str:
+    def _created_elsewhere(self, core_name: str) -> bool:
+        """After a failed CREATE, check whether the cached miss was stale."""
+        return self._core_status is not None and self._fetch_core_exists(core_name)
+
+    def create_core(self, core_name: str) -> Result:
         """Create a new Solr core."""
         if self.check_core_exists(core_name):
-            return f"Core {core_name} already exists."
+            return Result(True, f"Core {core_name} already exists.")
         
         params = {
             'action': 'CREATE',
@@ -70,134 +184,227 @@ class SolrClient:
             'configSet': '_default'
         }
         try:
-            response = requests.get(f"{self.base_url}/admin/cores", params=params)
+            response = self._session.get(f"{self.base_url}/admin/cores", params=params, timeout=self._timeout)
             response.raise_for_status()
             logger.info(f"Core creation response: {response.text}")
             if 'success' in response.json():
-                return f"Core {core_name} created successfully."
+                if self._core_status is not None:
+                    self._core_status[core_name] = {}
+                self._enable_soft_commit(core_name)
+                return Result(True, f"Core {core_name} created successfully.")
+            elif self._created_elsewhere(core_name):
+                return Result(True, f"Core {core_name} already exists.")
             else:
-                return f"Failed to create core {core_name}. Response: {response.text}"
+                return Result(False, error=f"Failed to create core {core_name}. Response: {response.text}")
         except requests.exceptions.RequestException as e:
             logger.error(f"Error creating core {core_name}: {str(e)}")
-            if hasattr(e, 'response'):
+            if e.response is not None:
                 logger.error(f"Response status code: {e.response.status_code}")
                 logger.error(f"Response content: {e.response.text}")
-            return f"Failed to create core {core_name}. Error: {str(e)}"
+            if self._created_elsewhere(core_name):
+                return Result(True, f"Core {core_name} already exists.")
+            return Result(False, error=f"Failed to create core {core_name}. Error: {str(e)}")
 
-    def index_data(self, core_name: str, exclude_column: str, csv_file: str) -> str:
+    def _enable_soft_commit(self, core_name: str, max_time_ms: int = 1000) -> None:
+        """Let Solr open new searchers on its own instead of the client committing per call."""
+        try:
+            response = self._session.post(
+                f"{self.base_url}/{core_name}/config",
+                json={'set-property': {'updateHandler.autoSoftCommit.maxTime': max_time_ms}},
+                timeout=self._timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not enable autoSoftCommit on {core_name}: {str(e)}")
+
+    def _iter_batches(self, csv_file: str, exclude_column: str, batch_size: int) -> Iterator[List[Dict[str, str]]]:
+        """Yield the CSV as lists of at most batch_size documents, without the excluded column."""
+        with open(csv_file, 'r', newline='', buffering=1 << 20) as file:
+            # Ask the kernel for aggressive readahead on large files read front to back
+            if hasattr(os, 'posix_fadvise') and os.fstat(file.fileno()).st_size >= 1 << 20:
+                os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            reader = csv.reader(file)
+            header = next(reader, [])
+            # Drop the excluded column at parse time rather than per row
+            keep_idx = tuple(i for i, name in enumerate(header) if name != exclude_column)
+            keep_names = tuple(header[i] for i in keep_idx)
+            # Rows at least this wide hold every kept column, so pick can't index past the end
+            kept_width = keep_idx[-1] + 1 if keep_idx else 0
+            pick: Callable[[List[str]], Tuple[str, ...]]
+            if len(keep_idx) > 1:
+                pick = itemgetter(*keep_idx)
+            else:
+                # itemgetter returns a bare value for one index and needs at least one
+                pick = lambda row: tuple(row[i] for i in keep_idx)
+            batch: List[Dict[str, str]] = []
+            for row in reader:
+                if not row:
+                    # csv.reader yields [] for blank lines, which DictReader skipped
+                    continue
+                if len(row) < kept_width:
+                    # Short row: leave out the missing fields rather than index past the end
+                    batch.append({name: row[i] for name, i in zip(keep_names, keep_idx) if i < len(row)})
+                else:
+                    batch.append(dict(zip(keep_names, pick(row))))
+                if len(batch) >= batch_size:
+                    yield batch
+                    # Release the sent batch before parsing the next one
+                    batch = []
+            if batch:
+                yield batch
+
+    def index_data(self, core_name: str, exclude_column: str, csv_file: str) -> Result:
         """Index data from a CSV file into a Solr core."""
         try:
-            solr = pysolr.Solr(f'{self.base_url}/{core_name}/', always_commit=True)
-            with open(csv_file, 'r') as file:
-                reader = csv.DictReader(file)
-                documents = [{k: v for k, v in row.items() if k != exclude_column} for row in reader]
-            logger.info(f"Attempting to index {len(documents)} documents into {core_name}")
-            solr.add(documents)
-            return f"Data indexed into {core_name}, excluding column {exclude_column}"
+            batch_size = int(os.getenv('SOLR_BATCH', '1000'))
+            indexed = self._stream_update(core_name, self._iter_batches(csv_file, exclude_column, batch_size))
+            # One commit per core; wait for the new searcher so the reads that follow see the data
+            self._solr(core_name).commit()
+            logger.info(f"Indexed {indexed} documents into {core_name}")
+            return Result(True, f"Data indexed into {core_name}, excluding column {exclude_column}")
         except FileNotFoundError:
             logger.error(f"Error: {csv_file} file not found in the current directory.")
-            return f"Failed to index data: CSV file {csv_file} not found"
+            return Result(False, error=f"Failed to index data: CSV file {csv_file} not found")
         except Exception as e:
             logger.error(f"Error indexing data: {str(e)}")
-            return f"Failed to index data: {str(e)}"
+            return Result(False, error=f"Failed to index data: {str(e)}")
 
-    def search_by_column(self, core_name: str, column_name: str, column_value: str) -> List[Dict]:
-        """Search for documents in a Solr core based on a column value."""
+    def search_by_column(self, core_name: str, column_name: str, column_value: str,
+                         fields: Optional[List[str]] = None, rows: int = 100) -> Result:
+        """Search for documents in a Solr core based on a column value, returning only `fields` if given."""
         try:
-            solr = pysolr.Solr(f'{self.base_url}/{core_name}/', always_commit=True)
-            query = f'{column_name}:"{column_value}"'
-            results = solr.search(query)
-            return list(results)
+            if column_name == 'id':
+                return Result(True, self._get_by_id(core_name, column_value, fields))
+            query = f'{column_name}:"{column_value.translate(_LUCENE_ESCAPE)}"'
+            params: Dict[str, Union[str, int]] = {'q': query, 'rows': rows}
+            if fields:
+                params['fl'] = ','.join(fields)
+            return Result(True, self._select(core_name, params)['response']['docs'])
         except Exception as e:
             logger.error(f"Search error details: {str(e)}")
-            return []
+            return Result(False, error=f"Failed to search: {str(e)}")
 
-    def get_employee_count(self, core_name: str) -> Union[int, str]:
+    def get_employee_count(self, core_name: str) -> Result:
         """Get the total number of documents (employees) in a Solr core."""
         try:
-            solr = pysolr.Solr(f'{self.base_url}/{core_name}/', always_commit=True)
-            results = solr.search('*:*', rows=0)
-            return results.hits
+            return Result(True, self._select(core_name, {'q': '*:*', 'rows': 0})['response']['numFound'])
         except Exception as e:
             logger.error(f"Error getting employee count: {str(e)}")
-            return f"Failed to get employee count: {str(e)}"
+            return Result(False, error=f"Failed to get employee count: {str(e)}")
 
-    def delete_employee_by_id(self, core_name: str, employee_id: str) -> str:
+    def delete_employee_by_id(self, core_name: str, employee_id: str) -> Result:
         """Delete an employee document from a Solr core by ID."""
         try:
-            solr = pysolr.Solr(f'{self.base_url}/{core_name}/', always_commit=True)
-            solr.delete(id=employee_id)
-            return f"Employee with ID {employee_id} deleted from {core_name}"
+            solr = self._solr(core_name)
+            # A soft commit makes the delete visible to the next read without an fsync
+            solr.delete(id=employee_id, commit=False, softCommit=True)
+            return Result(True, f"Employee with ID {employee_id} deleted from {core_name}")
         except Exception as e:
             logger.error(f"Error deleting employee: {str(e)}")
-            return f"Failed to delete employee: {str(e)}"
+            return Result(False, error=f"Failed to delete employee: {str(e)}")
+
+    def commit(self, core_name: str) -> Result:
+        """Issue a single hard commit to make pending changes on a core durable."""
+        try:
+            self._solr(core_name).commit()
+            return Result(True, f"Changes committed to {core_name}")
+        except Exception as e:
+            logger.error(f"Error committing changes: {str(e)}")
+            return Result(False, error=f"Failed to commit changes: {str(e)}")
+
+    def _department_facet_query(self, core_name: str, facet_limit: int) -> Tuple[int, Dict[str, int]]:
+        """Run the *:* Department facet query and return (numFound, {department: count})."""
+        results = self._select(core_name, {'q': '*:*', 'rows': 0, 'facet': 'on',
+                                           'facet.field': 'Department', 'facet.limit': facet_limit})
+        # Pair up the flat [term, count, ...] list without slicing copies
+        it = iter(results['facet_counts']['facet_fields']['Department'])
+        return results['response']['numFound'], dict(zip(it, it))
 
-    def get_department_facet(self, core_name: str) -> Dict[str, int]:
-        """Get a facet count of departments in a Solr core."""
+    def get_department_facet(self, core_name: str, facet_limit: int = -1) -> Result:
+        """Get a facet count of departments in a Solr core; facet_limit=-1 returns every department."""
         try:
-            solr = pysolr.Solr(f'{self.base_url}/{core_name}/', always_commit=True)
-            results = solr.search('*:*', facet='on', facet_field='Department')
-            facet_counts = results.facets['facet_fields']['Department']
-            return dict(zip(facet_counts[::2], facet_counts[1::2]))
+            return Result(True, self._department_facet_query(core_name, facet_limit)[1])
         except Exception as e:
             logger.error(f"Error getting department facet: {str(e)}")
-            return {}
-
-def setup_cores(client: SolrClient, core_names: List[str]) -> None:
-    """Set up Solr cores."""
-    for core_name in core_names:
-        logger.info(f"Creating core: {core_name}")
-        result = client.create_core(core_name)
-        logger.info(result)
-
-def index_data_to_cores(client: SolrClient, core_configs: Dict[str, str], csv_file: str) -> None:
-    """Index data into Solr cores."""
-    for core_name, exclude_column in core_configs.items():
-        logger.info(f"Indexing data into {core_name}")
-        result = client.index_data(core_name, exclude_column, csv_file)
-        logger.info(result)
-
-def perform_operations(client: SolrClient, core_name: str) -> None:
+            return Result(False, error=f"Failed to get department facet: {str(e)}")
+
+    def get_count_and_facet(self, core_name: str) -> Result:
+        """Get the document count and the full department facet in a single query."""
+        try:
+            return Result(True, self._department_facet_query(core_name, -1))
+        except Exception as e:
+            logger.error(f"Error getting employee count and department facet: {str(e)}")
+            return Result(False, error=f"Failed to get employee count and department facet: {str(e)}")
+
+def log_result(result: Result, message: Optional[str] = None) -> None:
+    """Log an operation's value (prefixed by `message`) on success, or its error."""
+    if not result.ok:
+        logger.error(result.error)
+    elif message is None:
+        logger.info(result.value)
+    else:
+        logger.info(f"{message}{result.value}")
+
+async def perform_operations(client: SolrClient, core_name: str) -> None:
     """Perform various operations on a Solr core."""
+    search_department = os.getenv('SEARCH_DEPARTMENT', 'IT')
+    # The search doesn't depend on the delete, so run it alongside
+    search_task = asyncio.create_task(
+        asyncio.to_thread(client.search_by_column, core_name, 'Department', search_department))
+
     # Delete an employee
-    del_result = client.delete_employee_by_id(core_name, os.getenv('EMPLOYEE_ID_TO_DELETE', 'E02003'))
-    logger.info(del_result)
+    employee_id = os.getenv('EMPLOYEE_ID_TO_DELETE', 'E02003')
+    log_result(await asyncio.to_thread(client.delete_employee_by_id, core_name, employee_id))
 
-    # Get employee count
-    emp_count = client.get_employee_count(core_name)
-    logger.info(f"Employee count in {core_name}: {emp_count}")
+    # Get employee count and department facet in one round trip; the delete was
+    # soft-committed, so both reflect it
+    count_and_facet = await asyncio.to_thread(client.get_count_and_facet, core_name)
 
     # Search by column
-    search_department = os.getenv('SEARCH_DEPARTMENT', 'IT')
-    logger.info(f"Employees in {search_department} department ({core_name}):")
-    search_result = client.search_by_column(core_name, 'Department', search_department)
-    logger.info(search_result)
+    log_result(await search_task, f"Employees in {search_department} department ({core_name}): ")
+
+    if count_and_facet.ok:
+        emp_count, facet_result = count_and_facet.value
+        logger.info(f"Employee count in {core_name}: {emp_count}")
+        logger.info(f"Department facet for {core_name}: {facet_result}")
+    else:
+        log_result(count_and_facet)
 
-    # Get department facet
-    logger.info(f"Department facet for {core_name}:")
-    facet_result = client.get_department_facet(core_name)
-    logger.info(facet_result)
+async def run_core_pipeline(client: SolrClient, core_name: str, exclude_column: str, csv_file: str) -> None:
+    """Create, index and query one core; each step waits only on the previous step for the same core."""
+    logger.info(f"Creating core: {core_name}")
+    log_result(await asyncio.to_thread(client.create_core, core_name))
 
-def main():
+    logger.info(f"Indexing data into {core_name}")
+    log_result(await asyncio.to_thread(client.index_data, core_name, exclude_column, csv_file))
+
+    await perform_operations(client, core_name)
+
+async def main() -> None:
     """Main execution function."""
+    # Blocking client calls run on this pool, which also caps in-flight Solr requests
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=MAX_WORKERS))
     client = SolrClient(os.getenv('SOLR_URL', 'http://localhost:8983/solr'))
 
-    if not client.check_connection():
+    if not await asyncio.to_thread(client.check_connection):
         logger.error("Unable to connect to Solr. Please check the Solr URL and ensure Solr is running.")
         return
 
     core_names = os.getenv('CORE_NAMES', 'Hash_YourName,Hash_1234').split(',')
-    setup_cores(client, core_names)
-
     core_configs = {
         core_name: os.getenv(f'{core_name.upper()}_EXCLUDE_COLUMN', 'Department')
         for core_name in core_names
     }
     csv_file = os.getenv('CSV_FILE', 'employee_data.csv')
-    index_data_to_cores(client, core_configs, csv_file)
 
-    for core_name in core_names:
-        perform_operations(client, core_name)
+    # Cores have no ordering between them, so their pipelines run concurrently
+    await asyncio.gather(*(
+        run_core_pipeline(client, core_name, exclude_column, csv_file)
+        for core_name, exclude_column in core_configs.items()
+    ))
+
+    for result in await asyncio.gather(*(asyncio.to_thread(client.commit, c) for c in core_names)):
+        log_result(result)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())